@@ -3,6 +3,7 @@
 #include <stddef.h>
 #include <stdlib.h>
 #include <stdio.h>
+#include <string.h>
 
 // ---------- RISC-V Instruction Definitions ----------
 
@@ -235,6 +236,20 @@ typedef struct riscv64_cpu {
 
     // Host services struct
     rsk_host_services_t host;
+
+    // Host RAM attached for direct access (NULL if every access goes through the host services)
+    byte* ram_base;
+    dword ram_size;
+
+    // Host-owned count of direct RAM stores (NULL if the host doesn't want one)
+    dword* ram_stores;
+
+    // Console input ring attached by the host (NULL if input-port loads always go through the host services)
+    byte* input_ring;
+    uint32_t* input_head;
+    uint32_t* input_tail;
+    uint32_t input_mask;
+    dword input_port;
     
     // CPU statistics struct
     rsk_stat_t stats;
@@ -279,6 +294,12 @@ riscv_cpu_t* cpu_init(riscv_cpu_t* cpu, const rsk_host_services_t* const service
 	cpu->host.log_msg   = services->log_msg;
 	cpu->host.panic     = services->panic;
 
+	cpu->ram_base = NULL;
+	cpu->ram_size = 0;
+	cpu->ram_stores = NULL;
+
+	cpu->input_ring = NULL;
+
 	cpu->stats.instructions = 0;
 	cpu->stats.loads        = 0;
 	cpu->stats.load_misses  = 0;
@@ -296,6 +317,26 @@ riscv_cpu_t* cpu_init(riscv_cpu_t* cpu, const rsk_host_services_t* const service
     return cpu;
 }
 
+void cpu_attach_ram(riscv_cpu_t* const cpu, byte* base, dword size) {
+    if (NULL == cpu) return;
+    cpu->ram_base = base;
+    cpu->ram_size = (NULL == base) ? 0 : size;
+}
+
+void cpu_attach_input_ring(riscv_cpu_t* const cpu, byte* ring, uint32_t* head, uint32_t* tail, uint32_t mask, dword port) {
+    if (NULL == cpu) return;
+    cpu->input_ring = (NULL == head || NULL == tail) ? NULL : ring;
+    cpu->input_head = head;
+    cpu->input_tail = tail;
+    cpu->input_mask = mask;
+    cpu->input_port = port;
+}
+
+void cpu_attach_ram_stores(riscv_cpu_t* const cpu, dword* counter) {
+    if (NULL == cpu) return;
+    cpu->ram_stores = counter;
+}
+
 int cpu_is_running(const riscv_cpu_t* const cpu) {
     if (NULL == cpu) return 0;
     return cpu->is_running;
@@ -311,43 +352,112 @@ void cpu_set_config(riscv_cpu_t* const cpu, rsk_config_t config) {
     cpu->config = config;
 }
 
+// Direct RAM access requires host byte order to match RISC-V's (little-endian)
+#if defined(__BYTE_ORDER__) && (__BYTE_ORDER__ == __ORDER_LITTLE_ENDIAN__)
+// Nonzero if an access of <size> bytes at <address> can be served straight from host RAM (aligned and in range)
+#define RAM_DIRECT(address, size) (NULL != cpu->ram_base && 0 == ((address) & ((size) - 1)) && \
+                                   (address) < cpu->ram_size && cpu->ram_size - (address) >= (size))
+#else
+#define RAM_DIRECT(address, size) 0
+#endif
+
+// Let the host know RAM has changed under it (e.g., so it can reuse RAM checksums until it does)
+#define RAM_STORED() do { if (NULL != cpu->ram_stores) *cpu->ram_stores += 1; } while (0)
+
+// If <address> is the console input port and the host's input ring has a byte waiting, pop it into <value> and return 1
+static int input_ring_pop(const riscv_cpu_t* const cpu, dword address, byte* value) {
+    if (NULL == cpu->input_ring || address != cpu->input_port) return 0;
+
+    // the host only refills the ring from inside its host services calls (on this thread), so plain accesses suffice
+    uint32_t tail = *cpu->input_tail;
+    if (*cpu->input_head == tail) return 0;
+
+    *value = cpu->input_ring[tail & cpu->input_mask];
+    *cpu->input_tail = tail + 1;
+    return 1;
+}
+
 byte cpu_load_byte(const riscv_cpu_t* const cpu, dword address) {
     if (NULL == cpu) return 0;
+    if (RAM_DIRECT(address, 1)) return cpu->ram_base[address];
+    byte input;
+    if (input_ring_pop(cpu, address, &input)) return input;
     return cpu->host.mem_load_byte(address);
 }
 
 void cpu_store_byte(const riscv_cpu_t* const cpu, dword address, byte value) {
     if (NULL == cpu) return;
+    if (RAM_DIRECT(address, 1)) {
+        cpu->ram_base[address] = value;
+        RAM_STORED();
+        return;
+    }
     cpu->host.mem_store_byte(address, value);
 }
 
 hword cpu_load_hword(const riscv_cpu_t* const cpu, dword address) {
     if (NULL == cpu) return 0;
+    if (RAM_DIRECT(address, sizeof(hword))) {
+        hword value;
+        memcpy(&value, cpu->ram_base + address, sizeof(hword));
+        return value;
+    }
+    byte input;
+    if (input_ring_pop(cpu, address, &input)) return input;
     return cpu->host.mem_load_hword(address);
 }
 
 void cpu_store_hword(const riscv_cpu_t* const cpu, dword address, hword value) {
     if (NULL == cpu) return;
+    if (RAM_DIRECT(address, sizeof(hword))) {
+        memcpy(cpu->ram_base + address, &value, sizeof(hword));
+        RAM_STORED();
+        return;
+    }
     cpu->host.mem_store_hword(address, value);
 }
 
 word cpu_load_word(const riscv_cpu_t* const cpu, dword address) {
     if (NULL == cpu) return 0;
+    if (RAM_DIRECT(address, sizeof(word))) {
+        word value;
+        memcpy(&value, cpu->ram_base + address, sizeof(word));
+        return value;
+    }
+    byte input;
+    if (input_ring_pop(cpu, address, &input)) return input;
     return cpu->host.mem_load_word(address);
 }
 
 void cpu_store_word(const riscv_cpu_t* const cpu, dword address, word value) {
     if (NULL == cpu) return;
+    if (RAM_DIRECT(address, sizeof(word))) {
+        memcpy(cpu->ram_base + address, &value, sizeof(word));
+        RAM_STORED();
+        return;
+    }
     cpu->host.mem_store_word(address, value);
 }
 
 dword cpu_load_dword(const riscv_cpu_t* const cpu, dword address) {
     if (NULL == cpu) return 0;
+    if (RAM_DIRECT(address, sizeof(dword))) {
+        dword value;
+        memcpy(&value, cpu->ram_base + address, sizeof(dword));
+        return value;
+    }
+    byte input;
+    if (input_ring_pop(cpu, address, &input)) return input;
     return cpu->host.mem_load_dword(address);
 }
 
 void cpu_store_dword(const riscv_cpu_t* const cpu, dword address, dword value) {
     if (NULL == cpu) return;
+    if (RAM_DIRECT(address, sizeof(dword))) {
+        memcpy(cpu->ram_base + address, &value, sizeof(dword));
+        RAM_STORED();
+        return;
+    }
     cpu->host.mem_store_dword(address, value);
 }
 
@@ -418,6 +528,11 @@ void cpu_fill_stats(const riscv_cpu_t* const cpu, rsk_stat_t* stats) {
     stats->store_misses = cpu->stats.store_misses;
 }
 
+const rsk_stat_t* cpu_stats_pointer(const riscv_cpu_t* const cpu) {
+    if (NULL == cpu) return NULL;
+    return &cpu->stats;
+}
+
 unsigned int cpu_stat_instructions(riscv_cpu_t* const cpu) {
     return cpu->stats.instructions;
 }
@@ -452,7 +567,7 @@ void cpu_disassemble_instr(riscv_cpu_t* const cpu, char* buffer, size_t buffer_s
 void cpu_disassemble(riscv_cpu_t* const cpu, char* buffer, size_t buffer_size) {
     if (NULL == cpu) return;
 
-    word instr = cpu->host.mem_load_word(cpu->pc);
+    word instr = cpu_load_word(cpu, cpu->pc);
     cpu_disassemble_instr(cpu, buffer, buffer_size, instr);
 }
 
@@ -461,7 +576,7 @@ int cpu_execute(riscv_cpu_t* const cpu) {
 	cpu->is_running = 1;
 
 	// get current instruction an add to disasm buffer
-	word instr = cpu->host.mem_load_word(cpu->pc);
+	word instr = cpu_load_word(cpu, cpu->pc);
 	if (instr == RV64I_EBREAK) {
 		cpu->is_running = 0;
 		return 0;
@@ -18,6 +18,15 @@ typedef struct riscv64_cpu riscv_cpu_t;
 // Initialize the CPU with default values and the provided host services
 riscv_cpu_t* cpu_init(riscv_cpu_t* cpu, const rsk_host_services_t* const services);
 
+// Let the CPU access <size> bytes of host RAM at <base> directly (NULL to go back to using the host services for every access)
+void cpu_attach_ram(riscv_cpu_t* const cpu, byte* base, dword size);
+
+// Let the CPU serve loads from the input port at <port> out of the host's input ring (NULL <ring> to go back to using the host services)
+void cpu_attach_input_ring(riscv_cpu_t* const cpu, byte* ring, uint32_t* head, uint32_t* tail, uint32_t mask, dword port);
+
+// Have the CPU increment *<counter> after each store it makes directly to host RAM (NULL to stop)
+void cpu_attach_ram_stores(riscv_cpu_t* const cpu, dword* counter);
+
 // Return 1 if the CPU is running, 0 otherwise
 int cpu_is_running(const riscv_cpu_t* const cpu);
 
@@ -78,6 +87,9 @@ void cpu_panic(const riscv_cpu_t* const cpu, const char* message);
 // Have the CPU fill the provided stats struct with its current statistics
 void cpu_fill_stats(const riscv_cpu_t* const cpu, rsk_stat_t* stats);
 
+// Get a pointer to the CPU's live statistics counters (NULL if there is no CPU)
+const rsk_stat_t* cpu_stats_pointer(const riscv_cpu_t* const cpu);
+
 // Get the number of instructions executed by the cpu since initialization
 unsigned int cpu_stat_instructions(riscv_cpu_t* const cpu);
 
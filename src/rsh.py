@@ -4,14 +4,16 @@
 # Professionally mutilated by Joshua Douglas and Ryan Moffitt
 
 import argparse
+import array
 import ast
+import collections
 import csv
 import ctypes
+import functools
 import hashlib
 import mmap
 import os
 import re
-import queue
 import struct
 import sys
 import threading
@@ -20,6 +22,12 @@ from typing import Optional
 
 __version__ = "2023-11-09-1200"
 
+# cffi (if installed) makes the frequently-called scalar kernel functions cheaper to call than ctypes does
+try:
+    import cffi
+except ImportError:
+    cffi = None
+
 try:
     import msvcrt
 
@@ -34,9 +42,10 @@ try:
             self._done.set()
 
         def run(self):
-            while not self._done.wait(0.01):
-                if msvcrt.kbhit():
-                    self._inputq.put(ord(msvcrt.getch()) & 0xff)
+            # msvcrt has nothing to block on, so poll (but not so often that idling costs anything)
+            while not self._done.wait(0.05):
+                while msvcrt.kbhit():
+                    self._inputq.append(ord(msvcrt.getch()) & 0xff)
                     if self._notify:
                         self._notify()
 except ImportError:
@@ -51,33 +60,55 @@ except ImportError:
             self._notify = notifier
             self._done = threading.Event()
 
+            # halt() writes to this pipe to wake run() out of its blocking select()
+            self._wake_r, self._wake_w = os.pipe()
+
         def halt(self):
+            if self._done.is_set():
+                return
             self._done.set()
+            try:
+                os.write(self._wake_w, b"x")
+            except OSError:
+                pass    # run() already gone
+            finally:
+                os.close(self._wake_w)
 
         def run(self):
             fd = sys.stdin.fileno()
             attrs = termios.tcgetattr(fd)
             tty.setcbreak(fd)
             try:
-                while not self._done.wait(0.1):
-                    rds, _, _ = select.select([fd], [], [], 0)
-                    if rds:
-                        data = os.read(fd, 16)
-                        for b in data:
-                            b &= 0xff
-                            self._inputq.put(13 if b == 10 else b)  # Hack: send '\r' if the user hits '\n'
-                        if self._notify:
-                            self._notify()
+                while True:
+                    rds, _, _ = select.select([fd, self._wake_r], [], [])
+                    if self._wake_r in rds:
+                        break
+                    try:
+                        data = os.read(fd, 64)
+                    except OSError:
+                        break   # terminal hung up
+                    if not data:
+                        break   # EOF: stdin stays readable forever, so stop selecting on it
+                    for b in data:
+                        b &= 0xff
+                        self._inputq.append(13 if b == 10 else b)  # Hack: send '\r' if the user hits '\n'
+                    if self._notify:
+                        self._notify()
             finally:
-                termios.tcsetattr(fd, termios.TCSADRAIN, attrs)
+                try:
+                    termios.tcsetattr(fd, termios.TCSADRAIN, attrs)
+                except termios.error:
+                    pass    # terminal already gone
+                os.close(self._wake_r)
 
 
 # Constants
 #######################################################################
 
-RGX_MEM_SIZE = re.compile(r"^(?P<size>\d+)(?P<scale>[kmg])b?$")
+RGX_COMPAT_SETTING = re.compile(r"(\w+)=(\S+)")
 
 MEM_SCALE = {
+    '':  1,
     'k': 1024,
     'm': 1024**2,
     'g': 1024**3,
@@ -85,6 +116,14 @@ MEM_SCALE = {
 
 # According to the RISC-V spec, EEI's may support misaligned loads/stores
 MEM_REQUIRE_ALIGNMENT = True
+ADDR_MASK_DWORD = 0b111
+ADDR_MASK_WORD = 0b11
+ADDR_MASK_HWORD = 0b1
+
+# Little-endian RAM access formats (RISC-V is little-endian regardless of host byte order)
+MEM_DWORD = struct.Struct("<Q")
+MEM_WORD = struct.Struct("<I")
+MEM_HWORD = struct.Struct("<H")
 
 ELF_HEADER = struct.Struct("<4s5B7x2H1I3Q1I6H")
 EH_MAGIC = 0
@@ -102,18 +141,30 @@ EH_SHSTRNDX = 18
 ET_EXEC = 2
 
 PROGRAM_HEADER = struct.Struct("<2I6Q")
-PH_TYPE = 0
-PH_OFFSET = 2
-PH_VADDR = 3
-PH_FILESZ = 5
-PH_MEMSZ = 6
+ProgramHeader = collections.namedtuple("ProgramHeader", "type flags offset vaddr paddr filesz memsz align")
 
 PT_LOAD = 1
 
 SECTION_HEADER = struct.Struct("<2I4Q2I2Q")
-SH_NAME = 0
-SH_OFFSET = 4
-SH_SIZE = 5
+SectionHeader = collections.namedtuple("SectionHeader", "name_off type flags addr offset size link info addralign entsize")
+
+# Maps each byte to itself if printable ASCII, else '.' (for hexdumps)
+HEXDUMP_PRINTABLE = bytes((b if 0x20 <= b < 0x7f else 0x2e) for b in range(256))
+
+# RAM checksum algorithms available for trace logs (blake2b is trimmed to MD5's width to keep trace columns tidy)
+CHECKSUM_ALGOS = {
+    "blake2b": functools.partial(hashlib.blake2b, digest_size=16),
+    "md5": hashlib.md5,
+    "sha1": hashlib.sha1,
+    "sha256": hashlib.sha256,
+}
+
+# Console output character for each byte value written to the write port (CR becomes LF)
+CONSOLE_CHARS = tuple(chr(i) if i != 13 else '\n' for i in range(256))
+
+# Log buffering: debug messages are written in batches, trace logs flushed every so many chars
+DLOG_BATCH_LINES = 256
+TLOG_FLUSH_CHARS = 4096
 
 # NOTE: ARM modes were removed without replacement
 
@@ -136,6 +187,19 @@ REG_NAME_MAP = {
     "s11": 27, "t3":  28, "t4":  29, "t5":  30, "t6": 31,
 }
 
+# Scalar rskAPI functions called through cffi when it is available (see RISCVSimKernel)
+RSK_CDEF = """
+uint64_t rsk_reg_get(int index);
+void rsk_reg_set(int index, uint64_t value);
+uint64_t rsk_pc_get(void);
+void rsk_pc_set(uint64_t value);
+unsigned int rsk_config_get(void);
+void rsk_config_set(unsigned int flags);
+int rsk_cpu_running(void);
+int rsk_cpu_run(int cycles);
+void rsk_cpu_signal(int signal);
+"""
+
 # Config flags
 RC_NOTHING      = 0X00000000
 RC_TRACE_LOG    = 0X00000001
@@ -170,6 +234,10 @@ class ElfFile(object):
         with open(filename, 'rb') as fd:
             self._raw = mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ)
 
+        # We walk the file front-to-back, so ask the kernel to read ahead
+        self._advise("MADV_SEQUENTIAL")
+        self._advise("MADV_WILLNEED")
+
         # Parse as a 32-bit ELF header
         fields = ELF_HEADER.unpack_from(self._raw)
 
@@ -184,18 +252,14 @@ class ElfFile(object):
         sh_table_start = fields[EH_SHOFF]
         sh_table_end = sh_table_start + sh_table_size
         sh_table_data = self._raw[sh_table_start:sh_table_end]
-        self._sections = [sh for sh in SECTION_HEADER.iter_unpack(sh_table_data)]
+        self._sections = list(map(SectionHeader._make, SECTION_HEADER.iter_unpack(sh_table_data)))
         
-        # Find the section-name-string-table section and extract string names
+        # Find the section-name-string-table section (names are only extracted if/when needed)
         strtab_sh = self._sections[fields[EH_SHSTRNDX]]
-        strtab_start = strtab_sh[SH_OFFSET]
-        strtab_end = strtab_start + strtab_sh[SH_SIZE]
-        strtab_data = self._raw[strtab_start:strtab_end]
-        self._section_names = []
-        for s in self._sections:
-            name_start = s[SH_NAME]
-            name_end = strtab_data.index(b'\0', name_start)
-            self._section_names.append(strtab_data[name_start:name_end].decode('utf-8'))
+        self._strtab_start = strtab_sh.offset
+        self._strtab_end = strtab_sh.offset + strtab_sh.size
+        self._section_names = None
+        self._section_index_by_name = None
         
         # Extract entry point
         self._entry = fields[EH_ENTRY]
@@ -205,33 +269,87 @@ class ElfFile(object):
         ph_table_start = fields[EH_PHOFF]
         ph_table_end = ph_table_start + ph_table_size
         ph_table_data = self._raw[ph_table_start:ph_table_end]
-        self._segments = [ph for ph in PROGRAM_HEADER.iter_unpack(ph_table_data)
-                             if ph[PH_TYPE] == PT_LOAD]
+        self._segments = [ph for ph in map(ProgramHeader._make, PROGRAM_HEADER.iter_unpack(ph_table_data))
+                             if ph.type == PT_LOAD]
     
+    def _advise(self, option, start=0, length=None):
+        """Best-effort madvise(<option>) hint for [part of] the file mapping.
+
+        Silently ignored where unsupported (e.g., Windows, or Python builds without mmap.madvise).
+        """
+        try:
+            if length is None:
+                self._raw.madvise(getattr(mmap, option), start)
+            else:
+                self._raw.madvise(getattr(mmap, option), start, length)
+        except (AttributeError, OSError, ValueError):
+            pass
+
     @property
     def entry(self):
         return self._entry
 
     @property
     def segments(self):
-        for _, flags, src_off, dst_addr, _, src_size, dst_size, _ in self._segments:
-            chunk = self._raw[src_off:src_off + src_size]
-            if dst_size > src_size:
-                chunk += b'\0'*(dst_size - src_size)
-            yield (dst_addr, flags, chunk)
+        """Yield (dst_addr, flags, chunk, pad) for each loadable segment.
+
+        <chunk> is the file-backed portion of the segment; <pad> is the number of zero bytes
+        that must follow it in memory (e.g., for .bss).
+        """
+        for ph in self._segments:
+            chunk = self._raw[ph.offset:ph.offset + ph.filesz]
+            yield (ph.vaddr, ph.flags, chunk, max(ph.memsz - ph.filesz, 0))
+
+            # The consumer has its own copy now; let the VM drop those (page-aligned) file pages
+            if ph.filesz:
+                start = ph.offset & ~(mmap.PAGESIZE - 1)
+                self._advise("MADV_DONTNEED", start, ph.offset + ph.filesz - start)
+
+    def _load_section_names(self):
+        """Extract all section names from the section-name string table and index them.
+        """
+        strtab_data = self._raw[self._strtab_start:self._strtab_end]
+        name_by_offset = {}
+        offset = 0
+        for name in strtab_data.split(b'\0'):
+            name_by_offset[offset] = name.decode('utf-8')
+            offset += len(name) + 1
+        self._section_names = []
+        for s in self._sections:
+            name = name_by_offset.get(s.name_off)
+            if name is None:
+                # Linkers may point sh_name into the tail of a longer string (e.g., ".text" inside ".rela.text")
+                name_end = strtab_data.index(b'\0', s.name_off)
+                name = strtab_data[s.name_off:name_end].decode('utf-8')
+            self._section_names.append(name)
+        self._section_index_by_name = {}
+        for i, name in enumerate(self._section_names):
+            self._section_index_by_name.setdefault(name, i)
 
     def get_section(self, name):
         """Return the raw bytes of a named section (or None if there is no such section).
         """
-        try:
-            index = self._section_names.index(name)
-        except ValueError:
+        if self._section_index_by_name is None:
+            self._load_section_names()
+        index = self._section_index_by_name.get(name)
+        if index is None:
             return None
-        else:
-            sh = self._sections[index]
-            start = sh[SH_OFFSET]
-            end = start + sh[SH_SIZE]
-            return self._raw[start:end]
+        sh = self._sections[index]
+        return self._raw[sh.offset:sh.offset + sh.size]
+
+    def find_section_fast(self, name : bytes) -> Optional[bytes]:
+        """Like get_section(), but locates a single section by searching the raw string table for <name>.
+
+        Avoids extracting/decoding every section name; falls back to get_section() if the quick
+        search comes up empty (e.g., the name shares its string-table entry with a longer name).
+        """
+        p = self._raw.find(b"\0" + name + b"\0", self._strtab_start, self._strtab_end)
+        if p >= 0:
+            name_off = p + 1 - self._strtab_start
+            for sh in self._sections:
+                if sh.name_off == name_off:
+                    return self._raw[sh.offset:sh.offset + sh.size]
+        return self.get_section(name.decode('utf-8'))
 
 
 class RISCVSimElfCompatScript:
@@ -247,9 +365,14 @@ class RISCVSimElfCompatScript:
         self._regs = []
         self._pc = None
 
-        chunks = riscvsim_section.decode('utf-8').lower().split()
-        for c in chunks:
-            name, value = c.split('=', 1)
+        reg_map = REG_NAME_MAP
+        regs = self._regs
+        match = RGX_COMPAT_SETTING.fullmatch
+        for c in riscvsim_section.decode('utf-8').lower().split():
+            m = match(c)
+            if m is None:
+                raise ValueError("malformed .riscvsim setting: {0!r}".format(c))
+            name, value = m.groups()
             if value == "entry":
                 value = elf_entry_point
             else:
@@ -257,8 +380,7 @@ class RISCVSimElfCompatScript:
             if name == "pc":
                 self._pc = value
             else:
-                reg = REG_NAME_MAP[name]
-                self._regs.append((reg, value))
+                regs.append((reg_map[name], value))
 
     def apply(self, rsk):
         """Apply a compatibiliy setting script to an already-initialized/reset kernel.
@@ -275,31 +397,35 @@ class rskHostServices(ctypes.Structure):
     Contains function pointers (ctypes callbacks) that allows a loaded
     kernel to call host-provided memory load/store functions and host-provided
     message logging functions.
+
+    Also publishes the location/size of host RAM so the kernel can perform
+    aligned, in-range RAM accesses directly (the callbacks remain the fallback
+    for MMIO, misaligned, and out-of-range accesses).
     """
 
 	# dword (*mem_load_dword)(dword address);
-    MEM_LOAD_DWORD_TYPE = ctypes.CFUNCTYPE(ctypes.c_ulong, ctypes.c_ulong)
+    MEM_LOAD_DWORD_TYPE = ctypes.CFUNCTYPE(ctypes.c_uint64, ctypes.c_uint64)
 
 	# void (*mem_store_dword)(dword address, dword value);
-    MEM_STORE_DWORD_TYPE = ctypes.CFUNCTYPE(None, ctypes.c_ulong, ctypes.c_ulong)
+    MEM_STORE_DWORD_TYPE = ctypes.CFUNCTYPE(None, ctypes.c_uint64, ctypes.c_uint64)
 
 	# word (*mem_load_word)(dword address);
-    MEM_LOAD_WORD_TYPE = ctypes.CFUNCTYPE(ctypes.c_uint, ctypes.c_ulong)
+    MEM_LOAD_WORD_TYPE = ctypes.CFUNCTYPE(ctypes.c_uint, ctypes.c_uint64)
 
 	# void (*mem_store_word)(dword address, word value);
-    MEM_STORE_WORD_TYPE = ctypes.CFUNCTYPE(None, ctypes.c_ulong, ctypes.c_uint)
+    MEM_STORE_WORD_TYPE = ctypes.CFUNCTYPE(None, ctypes.c_uint64, ctypes.c_uint)
 
 	# hword (*mem_load_hword)(dword address);
-    MEM_LOAD_HWORD_TYPE = ctypes.CFUNCTYPE(ctypes.c_ushort, ctypes.c_ulong)
+    MEM_LOAD_HWORD_TYPE = ctypes.CFUNCTYPE(ctypes.c_ushort, ctypes.c_uint64)
 
 	# void (*mem_store_hword)(dword address, hword value);
-    MEM_STORE_HWORD_TYPE = ctypes.CFUNCTYPE(None, ctypes.c_ulong, ctypes.c_ushort)
+    MEM_STORE_HWORD_TYPE = ctypes.CFUNCTYPE(None, ctypes.c_uint64, ctypes.c_ushort)
 
 	# byte (*mem_load_byte)(dword address);
-    MEM_LOAD_BYTE_TYPE = ctypes.CFUNCTYPE(ctypes.c_ubyte, ctypes.c_ulong)
+    MEM_LOAD_BYTE_TYPE = ctypes.CFUNCTYPE(ctypes.c_ubyte, ctypes.c_uint64)
 
 	# void (*mem_store_byte)(dword address, byte value);
-    MEM_STORE_BYTE_TYPE = ctypes.CFUNCTYPE(None, ctypes.c_ulong, ctypes.c_ubyte)
+    MEM_STORE_BYTE_TYPE = ctypes.CFUNCTYPE(None, ctypes.c_uint64, ctypes.c_ubyte)
 
     # void (*log_trace)(unsigned step, dword pc, dword *registers);
     LOG_TRACE_TYPE = ctypes.CFUNCTYPE(None, ctypes.c_uint, ctypes.c_uint64, ctypes.POINTER(ctypes.c_uint64))
@@ -311,7 +437,7 @@ class rskHostServices(ctypes.Structure):
     PANIC_TYPE = ctypes.CFUNCTYPE(None, ctypes.c_char_p)
     
 
-    _fields_ = [
+    CALLBACK_FIELDS = [
         ("mem_load_dword",  MEM_LOAD_DWORD_TYPE),
         ("mem_store_dword", MEM_STORE_DWORD_TYPE),
         ("mem_load_word",   MEM_LOAD_WORD_TYPE),
@@ -325,6 +451,8 @@ class rskHostServices(ctypes.Structure):
         ("panic",           PANIC_TYPE),
     ]
 
+    _fields_ = CALLBACK_FIELDS
+
 
 class rskHostStats(ctypes.Structure):
     """Stats counters published by RISC-V Sim kernels.
@@ -348,7 +476,7 @@ class rskMockHost:
     def __init__(self):
         self._hs = rskHostServices()
         self._calls = {}
-        for aname, atype in rskHostServices._fields_:
+        for aname, atype in rskHostServices.CALLBACK_FIELDS:
             setattr(self._hs, aname, atype(getattr(self, aname)))
             self._calls[aname] = []
 
@@ -421,6 +549,18 @@ def mmio_nop_store(address, value):
     pass
 
 
+# Handlers for MMIO addresses no port was registered at
+def mmio_unmapped_load(address):
+    panic("unimplemented MMIO load from {0:#x}".format(address))
+
+
+def mmio_unmapped_store(address, value):
+    panic("unimplemented MMIO store to {0:#x}".format(address))
+
+
+MMIO_UNMAPPED = (mmio_unmapped_load, mmio_unmapped_store)
+
+
 class RISCVSimShell:
     """Class representing the host system that contains an RISC-V Sim kernel.
     
@@ -429,19 +569,24 @@ class RISCVSimShell:
     
     MMIO_BASE = 0x80000000
     
-    def __init__(self, mem_size, trace_log=None, debug_log=None, checksum=False, disasm_func=None, register_history=None):
+    def __init__(self, mem_size, trace_log=None, debug_log=None, checksum=False, disasm_func=None, register_history=None,
+                 checksum_algo="blake2b"):
         """Create an RISC-V Sim host system with <mem_size> bytes of RAM.
         
         If <trace_log> is not None, generate a trace log to that file (STDERR if <trace_log> is '-').
         If <debug_log> is not None, generate a debug log to that file (STDERR if <debug_log> is '-').
 
         If <disasm_func> is non-None, call it to include the disassembly of the instruction executed for each trace log record.
+
+        If <checksum> is true, include a RAM checksum (computed with <checksum_algo>, a key of CHECKSUM_ALGOS) in each trace log record.
         """
         # Ensure sane/legal memory sizes (word-aligned)
         assert (0x1000 <= mem_size < self.MMIO_BASE)
         assert ((mem_size & 0b11) == 0)
         
-        self._show_md5 = checksum
+        self._show_checksum = checksum
+        self._checksum_algo = CHECKSUM_ALGOS[checksum_algo]
+        self._no_checksum = "-" * (2 * self._checksum_algo().digest_size)
         self._disasm_func = disasm_func
         if trace_log:
             self._tlog = open(trace_log, "wt", encoding="utf-8") if trace_log != '-' else sys.stderr
@@ -452,15 +597,21 @@ class RISCVSimShell:
             self._dlog = open(debug_log, "wt", encoding="utf-8") if debug_log != '-' else sys.stderr
         else:
             self._dlog = None
+        self._dlog_buf = []
+        self._tlog_unflushed = 0
         
-        # Allocate a ctypes-array of bytes (equivalent to C unsigned char) that size
-        RamType = ctypes.c_ubyte * mem_size
+        # Allocate a bytearray of that size (with a cached memoryview for struct access)
         self._ramlen = mem_size
-        self._ram = RamType()
+        self._ram = bytearray(mem_size)
+        self._ramv = memoryview(self._ram)
+
+        # ctypes-array (equivalent to C unsigned char[]) aliasing the same storage, for C-side consumers
+        self._ram_c = (ctypes.c_ubyte * mem_size).from_buffer(self._ram)
         
-        print(register_history)
-        # Used to cache previous register values for log_trace()
-        self._register_history = register_history
+        # Used to cache previous register values for log_trace() (raw 64-bit storage, just like the kernel's)
+        if register_history is None:
+            register_history = [0] * 32
+        self._register_history = array.array('Q', register_history)
         
         # Set up host services callbacks
         hs = rskHostServices()
@@ -475,10 +626,20 @@ class RISCVSimShell:
         hs.log_trace = rskHostServices.LOG_TRACE_TYPE(self.log_trace)
         hs.log_msg = rskHostServices.LOG_MSG_TYPE(self.log_msg)
         hs.panic = rskHostServices.PANIC_TYPE(self.panic)
+
+        # With --checksum, a "ramstores" kernel counts its RAM stores so checksums can be reused until RAM changes
+        # (our own stores just drop the cached checksum, and only while caching is on)
+        self._ram_stores = ctypes.c_uint64(0)
+        self._cache_checksum = False
+        self._checksum_stores = None
+        self._checksum_value = None
         self._hs = hs
         
-        # Create MMIO and heartbeat registries
+        # Create MMIO and heartbeat registries (MMIO dispatch is one dict probe, falling back to MMIO_UNMAPPED)
+        # (the mem_* methods test against a per-instance copy of MMIO_BASE, which reads faster than the class attribute)
         self._mmio = {}
+        self._mmio_get = self._mmio.get
+        self._mmio_base = self.MMIO_BASE
         self._beats = []
     
     # Host Services (callbacks)
@@ -487,203 +648,193 @@ class RISCVSimShell:
     @property
     def host_services(self):
         return self._hs
+
+    @property
+    def ram(self):
+        """The ctypes array backing RAM (for "hostram" kernels to access directly).
+        """
+        return self._ram_c
     
     def mem_load_dword(self, address : int) -> int:
         # Require dword alignment
-        if MEM_REQUIRE_ALIGNMENT and (address & 0b111):
+        if MEM_REQUIRE_ALIGNMENT and (address & ADDR_MASK_DWORD):
             panic("misaligned load dword @ {0:016x}".format(address))
 
         # Is this an MMIO load?
-        if address >= self.MMIO_BASE:
-            try:
-                return self._mmio[address][0](address)
-            except KeyError:
-                panic("unimplemented MMIO load dword from {0:#x}".format(address))
-        else:
-            # Nope, RAM load; bounds check and return
-            if address >= self._ramlen:
-                panic("out-of-RAM load dword @ {0:016x}".format(address))
-            else:
-                value : int = (self._ram[address])
-                value += (self._ram[address + 1] << 8)
-                value += (self._ram[address + 2] << 16)
-                value += (self._ram[address + 3] << 24)
-                value += (self._ram[address + 4] << 32)
-                value += (self._ram[address + 5] << 40)
-                value += (self._ram[address + 6] << 48)
-                value += (self._ram[address + 7] << 56)
-                return value
+        if address >= self._mmio_base:
+            return self._mmio_get(address, MMIO_UNMAPPED)[0](address)
+
+        # Nope, RAM load (struct does the bounds check for us)
+        try:
+            return MEM_DWORD.unpack_from(self._ramv, address)[0]
+        except struct.error:
+            panic("out-of-RAM load dword @ {0:016x}".format(address))
 
     def mem_store_dword(self, address : int, value : int) -> int:
         # Require dword alignment
-        if MEM_REQUIRE_ALIGNMENT and (address & 0b111):
+        if MEM_REQUIRE_ALIGNMENT and (address & ADDR_MASK_DWORD):
             panic("misaligned store dword @ {0:016x}".format(address))
         
         # Is it MMIO?
-        if address >= self.MMIO_BASE:
-            try:
-                self._mmio[address][1](address, value)
-            except KeyError:
-                panic("unimplemented MMIO store dword to {0:#x}".format(address))
-        else:
-            if address >= self._ramlen:
-                panic("out-of-RAM store dword @ {0:016x}".format(address))
-            else:
-                self._ram[address] = (value)
-                self._ram[address + 1] = (value >> 8) & 0xff
-                self._ram[address + 2] = (value >> 16) & 0xff
-                self._ram[address + 3] = (value >> 24) & 0xff
-                self._ram[address + 4] = (value >> 32) & 0xff
-                self._ram[address + 5] = (value >> 40) & 0xff
-                self._ram[address + 6] = (value >> 48) & 0xff
-                self._ram[address + 7] = (value >> 56) & 0xff
+        if address >= self._mmio_base:
+            self._mmio_get(address, MMIO_UNMAPPED)[1](address, value)
+            return
+
+        try:
+            MEM_DWORD.pack_into(self._ramv, address, value & 0xffffffffffffffff)
+            if self._cache_checksum:
+                self._checksum_stores = None    # cached checksum is stale
+        except struct.error:
+            panic("out-of-RAM store dword @ {0:016x}".format(address))
     
     def mem_load_word(self, address : int) -> int:
         # Require word alignment
-        if MEM_REQUIRE_ALIGNMENT and (address & 0b11):
+        if MEM_REQUIRE_ALIGNMENT and (address & ADDR_MASK_WORD):
             panic("misaligned load word @ {0:016x}".format(address))
 
-
         # Is this an MMIO load?
-        if address >= self.MMIO_BASE:
-            try:
-                return self._mmio[address][0](address)
-            except KeyError:
-                panic("unimplemented MMIO load word from {0:#x}".format(address))
+        if address >= self._mmio_base:
+            return self._mmio_get(address, MMIO_UNMAPPED)[0](address)
 
-        else:
-            # Nope, RAM load; bounds check and return
-            if address >= self._ramlen:
-                panic("out-of-RAM load word @ {0:016x}".format(address))
-            else:
-                value : int = (self._ram[address])
-                value += (self._ram[address + 1]  << 8)
-                value += (self._ram[address + 2] << 16)
-                value += (self._ram[address + 3] << 24)
-                return value
+        # Nope, RAM load (struct does the bounds check for us)
+        try:
+            return MEM_WORD.unpack_from(self._ramv, address)[0]
+        except struct.error:
+            panic("out-of-RAM load word @ {0:016x}".format(address))
 
     def mem_store_word(self, address : int, value : int) -> int:
         # Require word alignment
-        if MEM_REQUIRE_ALIGNMENT and (address & 0b11):
+        if MEM_REQUIRE_ALIGNMENT and (address & ADDR_MASK_WORD):
             panic("misaligned store word @ {0:016x}".format(address))
         
         # Is it MMIO?
-        if address >= self.MMIO_BASE:
-            try:
-                self._mmio[address][1](address, value)
-            except KeyError:
-                panic("unimplemented MMIO store word to {0:#x}".format(address))
-        else:
-            if address >= self._ramlen:
-                panic("out-of-RAM store word @ {0:016x}".format(address))
-            else:
-                self._ram[address] = (value) & 0xff
-                self._ram[address + 1] = (value >> 8) & 0xff
-                self._ram[address + 2] = (value >> 16) & 0xff
-                self._ram[address + 3] = (value >> 24) & 0xff
+        if address >= self._mmio_base:
+            self._mmio_get(address, MMIO_UNMAPPED)[1](address, value)
+            return
+
+        try:
+            MEM_WORD.pack_into(self._ramv, address, value & 0xffffffff)
+            if self._cache_checksum:
+                self._checksum_stores = None    # cached checksum is stale
+        except struct.error:
+            panic("out-of-RAM store word @ {0:016x}".format(address))
 
     def mem_load_hword(self, address : int) -> int:
         # Require hword alignment
-        if MEM_REQUIRE_ALIGNMENT and (address & 0b1):
+        if MEM_REQUIRE_ALIGNMENT and (address & ADDR_MASK_HWORD):
             panic("misaligned load hword @ {0:016x}".format(address))
 
         # Is this an MMIO load?
-        if address >= self.MMIO_BASE:
-            try:
-                return self._mmio[address][0](address)
-            except KeyError:
-                panic("unimplemented MMIO load hword from {0:#x}".format(address))
-        else:
-            # Nope, RAM load; bounds check and return
-            if address >= self._ramlen:
-                panic("out-of-RAM load hword @ {0:016x}".format(address))
-            else:
-                value : int = (self._ram[address])
-                value += (self._ram[address + 1] << 8)
-                return value
+        if address >= self._mmio_base:
+            return self._mmio_get(address, MMIO_UNMAPPED)[0](address)
+
+        # Nope, RAM load (struct does the bounds check for us)
+        try:
+            return MEM_HWORD.unpack_from(self._ramv, address)[0]
+        except struct.error:
+            panic("out-of-RAM load hword @ {0:016x}".format(address))
 
     def mem_store_hword(self, address : int, value : int) -> int:
         # Require hword alignment
-        if MEM_REQUIRE_ALIGNMENT and (address & 0b1):
+        if MEM_REQUIRE_ALIGNMENT and (address & ADDR_MASK_HWORD):
             panic("misaligned store hword @ {0:016x}".format(address))
         
         # Is it MMIO?
-        if address >= self.MMIO_BASE:
-            try:
-                self._mmio[address][1](address, value)
-            except KeyError:
-                panic("unimplemented MMIO store hword to {0:#x}".format(address))
-        else:
-            if address >= self._ramlen:
-                panic("out-of-RAM store hword @ {0:016x}".format(address))
-            else:
-                self._ram[address] = (value) & 0xff
-                self._ram[address + 1] = (value >> 8) & 0xff
+        if address >= self._mmio_base:
+            self._mmio_get(address, MMIO_UNMAPPED)[1](address, value)
+            return
+
+        try:
+            MEM_HWORD.pack_into(self._ramv, address, value & 0xffff)
+            if self._cache_checksum:
+                self._checksum_stores = None    # cached checksum is stale
+        except struct.error:
+            panic("out-of-RAM store hword @ {0:016x}".format(address))
 
     def mem_load_byte(self, address : int) -> int:
         # Is this an MMIO load?
-        if address >= self.MMIO_BASE:
-            try:
-                return self._mmio[address][0](address)
-            except KeyError:
-                panic("unimplemented MMIO load byte from {0:#x}".format(address))
-        else:
-            # Nope, RAM load; bounds check and return
-            if address >= self._ramlen:
-                panic("out-of-RAM load byte @ {0:016x}".format(address))
+        if address >= self._mmio_base:
+            return self._mmio_get(address, MMIO_UNMAPPED)[0](address)
+
+        # Nope, RAM load (bytearray indexing does the bounds check for us)
+        try:
             return self._ram[address]
+        except IndexError:
+            panic("out-of-RAM load byte @ {0:016x}".format(address))
 
     def mem_store_byte(self, address : int, value : int) -> int:
         # Is it MMIO?
-        if address >= self.MMIO_BASE:
-            try:
-                self._mmio[address][1](address, value)
-            except KeyError:
-                panic("unimplemented MMIO store byte to {0:#x}".format(address))
-        else:
-            if address >= self._ramlen:
-                panic("out-of-RAM store byte @ {0:016x}".format(address))
-            else:
-                self._ram[address] = value
+        if address >= self._mmio_base:
+            self._mmio_get(address, MMIO_UNMAPPED)[1](address, value)
+            return
+
+        try:
+            self._ram[address] = value & 0xff
+            if self._cache_checksum:
+                self._checksum_stores = None    # cached checksum is stale
+        except IndexError:
+            panic("out-of-RAM store byte @ {0:016x}".format(address))
 
     def log_trace(self, step : int, pc : int, gprs) -> None:
-        if self._tlog:
+        tlog = self._tlog
+        if tlog:
             # Get checksum
-            cksum = self.md5() if self._show_md5 else "-"*32
+            cksum = self.checksum() if self._show_checksum else self._no_checksum
 
-            # Begin log entry
-            print("{0:06} {1:08x} {2}".format(step, pc, cksum), file=self._tlog)
+            # Begin log entry (built up in pieces and written all at once)
+            parts = ["{0:06} {1:08x} {2}\n\t\t".format(step, pc, cksum)]
 
-            # Print changed registers
+            # Add changed registers
             col_width = 4
             col = 0
-            print("\t\t", end='', file=self._tlog)
+            hist = self._register_history
+            regs = gprs[:32]    # one ctypes pointer read instead of 32
             for i in range(32):
-                if self._register_history[i] != gprs[i]:
-                    print("{0}={1:08x} ".format(i, gprs[i]), end='', file=self._tlog)
+                g = regs[i]
+                if hist[i] != g:
+                    parts.append("{0}={1:08x} ".format(i, g))
 
                     col += 1
                     if col == col_width:
-                        print('\n\t\t', end='', file=self._tlog)
+                        parts.append("\n\t\t")
                         col = 0
-                    self._register_history[i] = gprs[i]
-            print("\n", end='', file=self._tlog)
+                    hist[i] = g
+            parts.append("\n")
             
-            # Print dissasembly
-            if self._disasm_func:
+            # Add dissasembly
+            disasm = self._disasm_func
+            if disasm:
                 iaddr = pc
                 iword = self.mem_load_word(iaddr)
-                print("\t\t({0})".format(self._disasm_func(iaddr, iword)), file=self._tlog)
+                parts.append("\t\t({0})\n".format(disasm(iaddr, iword)))
 
-            self._tlog.flush()
+            # Keep any pending debug messages ahead of this record (they may share a stream)
+            if self._dlog_buf:
+                self._write_dlog()
+
+            record = "".join(parts)
+            tlog.write(record)
+            self._tlog_unflushed += len(record)
+            if self._tlog_unflushed >= TLOG_FLUSH_CHARS:
+                tlog.flush()
+                self._tlog_unflushed = 0
 
         for listener in self._beats:
             listener.heartbeat(step)
 
     def log_msg(self, msg):
         if self._dlog:
-            print(msg.decode("ascii"), file=self._dlog)
-            self._dlog.flush()
+            buf = self._dlog_buf
+            buf.append(msg.decode("ascii"))
+            buf.append("\n")
+            if len(buf) >= 2 * DLOG_BATCH_LINES:
+                self._write_dlog()
+
+    def _write_dlog(self):
+        """Write (but don't flush) any buffered debug log messages.
+        """
+        self._dlog.write("".join(self._dlog_buf))
+        self._dlog_buf.clear()
     
     def panic(self, msg):
         panic(msg.decode("ascii"))
@@ -696,7 +847,10 @@ class RISCVSimShell:
 
         If either (or both!) <on_load> or <on_store> is not provided, no-op defaults are used.
         """
-        self._mmio[self.MMIO_BASE + mmio_offset] = (on_load, on_store)
+        address = self.MMIO_BASE + mmio_offset
+        if address in self._mmio:
+            panic("MMIO registration @ {0:#x} overlaps an existing MMIO port".format(address))
+        self._mmio[address] = (on_load, on_store)
 
     def register_heartbeat(self, listener):
         """Register a <listener> object with a heartbeat(cycles) method for heartbeat notifications.
@@ -705,51 +859,64 @@ class RISCVSimShell:
         with the current cycle count on each tracing callback.
         """
         self._beats.append(listener)
-    
+
     def flush(self):
+        if self._dlog_buf:
+            self._write_dlog()
         if self._tlog:
             self._tlog.flush()
+            self._tlog_unflushed = 0
         if self._dlog:
             self._dlog.flush()
 
+    @property
+    def ram_stores(self):
+        """The ctypes c_uint64 counting RAM stores (for "ramstores" kernels to bump as they store to RAM directly).
+        """
+        return self._ram_stores
+
+    def cache_checksums(self):
+        """Reuse the last RAM checksum until RAM is stored to (only safe once the kernel is counting its stores in ram_stores).
+        """
+        self._cache_checksum = True
+
+    def checksum(self):
+        """Return the checksum of all RAM (using the configured checksum algorithm) as a hex string.
+        """
+        if self._cache_checksum:
+            stores = self._ram_stores.value
+            if stores != self._checksum_stores:
+                self._checksum_value = self._checksum_algo(self._ramv).hexdigest()
+                self._checksum_stores = stores
+            return self._checksum_value
+        return self._checksum_algo(self._ramv).hexdigest()
+
     def md5(self):
         """Return the MD5 checksum of all RAM as a hex string.
         """
-        hash = hashlib.md5()
-        if sys.byteorder == "little":
-            # We simulate little-endian RISC-V, so the data is already in correct order--just hash it as-is (FAST)
-            hash.update(self._ram)
-        else:
-            # Big-endian (SLOW)
-            for i in range(self._ramlen):
-                hash.update(bytes((self._ram[i],)))
-        return hash.hexdigest()
+        # RAM is a plain byte buffer in RISC-V (little-endian) order regardless of host byte order
+        return hashlib.md5(self._ramv).hexdigest()
     
     def load_elf(self, obj: ElfFile):
-        for addr, _, blob in obj.segments:
-            for i, b in enumerate(blob):
-                self._ram[addr + i] = b
+        for addr, _, blob, pad in obj.segments:
+            end = addr + len(blob)
+            if end + pad > self._ramlen:
+                panic("ELF segment @ {0:016x} does not fit in RAM".format(addr))
+            self._ram[addr:end] = blob
+            if pad:
+                ctypes.memset(ctypes.addressof(self._ram_c) + end, 0, pad)
+            if self._cache_checksum:
+                self._checksum_stores = None
     
     def hexdump(self, start : int, length : int) -> None:
-        ascii = []
-        for i, addr in enumerate(range(start, start + length)):
-            if not ascii:
-                print("{0:08x}  ".format(i), end="")
-            b = self._ram[addr]
-            ascii.append(bytes((b,)))
-            if (i + 1) & 0xf:
-                term = " "
-            else:
-                adisp = ''.join(a if len(str(a)) == 1 else '.' for a in ascii)
-                term = "  {0}\n".format(adisp)
-                ascii = []
-            print("{0:02x}".format(b), end=term)
-        if i & 0xf:
-            print("   " * (15 - (i & 0xf)), end=" ")
-            print(''.join(a if a.isprintable() else '.' for a in ascii))
+        """Print <length> bytes of RAM starting at <start>, 16 bytes (hex + ASCII) per line.
+        """
+        for base in range(start, start + length, 16):
+            row = bytes(self._ramv[base:min(base + 16, start + length)])
+            print("{0:08x}  {1:<47}  {2}".format(base, row.hex(' '), row.translate(HEXDUMP_PRINTABLE).decode('ascii')))
         
     def dump_ram_location(self):
-        print("ProTip: RAM @ {0:#x}".format(ctypes.addressof(self._ram)))
+        print("ProTip: RAM @ {0:#x}".format(ctypes.addressof(self._ram_c)))
 
 
 def input_playback(stream):
@@ -772,6 +939,37 @@ def input_playback(stream):
             pts = ts
 
 
+class ConsoleInputRing:
+    """Byte ring a "fastmmio" kernel serves console input-port loads from without calling back into Python.
+
+    The console only refills it from inside its MMIO load callback, i.e., on the kernel's thread while the
+    kernel waits on us, so the two sides never touch the ring at the same time.
+    """
+    def __init__(self, size=4096):
+        if size & (size - 1):
+            panic("console input ring size ({0}) must be a power of two".format(size))
+        self.buffer = (ctypes.c_ubyte * size)()
+        self.head = ctypes.c_uint32(0)  # advanced by us as bytes are added
+        self.tail = ctypes.c_uint32(0)  # advanced by the kernel as bytes are consumed
+        self.mask = size - 1
+
+    def refill(self, backlog):
+        """Move as many bytes from the front of <backlog> (a bytearray) into the ring as will fit.
+        """
+        head = self.head.value
+        n = min(len(backlog), self.mask + 1 - ((head - self.tail.value) & 0xffffffff))
+        if n:
+            # Take the bytes off in one slice, copy with (at most) two memmoves, and publish with a single head update
+            data = bytes(backlog[:n])
+            del backlog[:n]
+            start = head & self.mask
+            first = min(n, self.mask + 1 - start)
+            base = ctypes.addressof(self.buffer)
+            ctypes.memmove(base + start, data, first)
+            ctypes.memmove(base, data[first:], n - first)
+            self.head.value = (head + n) & 0xffffffff
+
+
 class RISCVSimConsole:
     """Toy serial console device implementation for and RISC-V Sim system.
 
@@ -795,7 +993,7 @@ class RISCVSimConsole:
     WRITE_PORT_OFFSET = 0
     READ_PORT_OFFSET = 4
 
-    def __init__(self, source=None, sink=sys.stdout, notifier=None):
+    def __init__(self, source=None, sink=sys.stdout, notifier=None, fast_input=False):
         """Initialize a console object.
 
         source: if None (the default), use getch() to fetch raw input from the [real] console
@@ -804,17 +1002,45 @@ class RISCVSimConsole:
         notifier: arg-less callable used to notify someone that we have new input
                     (must be a thread-safe notification, since it may be called from
                     a background thread)
+        fast_input: if True, pass pending input on to a ConsoleInputRing the kernel can read directly ("fastmmio")
         """
         self._notify = notifier
         self._sink = sink
+        self._sink_dirty = False    # output written since the last flush?
+
+        # Only interactive sinks need each line pushed out as it completes (files/pipes can just buffer)
+        try:
+            self._line_flush = sink.isatty()
+        except (AttributeError, ValueError):
+            self._line_flush = False
+
+        # Text sinks with a binary buffer underneath get pre-encoded bytes written straight to that buffer
+        # (skipping the text layer), unless that would change the output (newline translation/unencodable chars)
+        self._sink_write = sink.write
+        self._sink_table = CONSOLE_CHARS
+        self._sink_raw = False
+        buffer = getattr(sink, "buffer", None)
+        if buffer is not None and os.linesep == "\n":
+            try:
+                self._sink_table = tuple(c.encode(sink.encoding, sink.errors or "strict") for c in CONSOLE_CHARS)
+                self._sink_write = buffer.write
+                self._sink_raw = True
+            except (AttributeError, LookupError, TypeError, UnicodeError):
+                pass
 
         # Not attached to an RISC-V Sim system host yet
         self._host = None
 
-        # Input flows through this...
-        self._inputq = queue.Queue()
+        # Input flows through this (bytearray appends at the end and deletes from the front each happen in one
+        # step under the GIL, so they are safe for our single producer/consumer)...
+        self._inputq = bytearray()
 
-        # ...but what feeds it?
+        # ...and, for "fastmmio" kernels, gets handed on to this as the program reads it
+        self._ring = ConsoleInputRing() if fast_input else None
+
+        # ...but what feeds it? (no pending playback pair means heartbeats have nothing to do)
+        self._playsrc = None
+        self._playpair = None
         if source is None:
             # The real console
             self._playback = False
@@ -828,6 +1054,9 @@ class RISCVSimConsole:
             self._playpair = next(self._playsrc, None)
 
     def close(self):
+        if self._sink_dirty:
+            self._sink.flush()
+            self._sink_dirty = False
         if not self._playback:
             self._worker.halt()
 
@@ -836,16 +1065,31 @@ class RISCVSimConsole:
 
         (The callback will happen only if tracing is enabled in the underlying simulation kernel.)
         """
-        if self._playback:
-            send_irq = False
-            while self._playpair and (self._playpair[0] <= cycles):
-                for byte in self._playpair[1]:
-                    self._inputq.put(byte)
-                    send_irq = True
-                self._playpair = next(self._playsrc, None)
+        # Common case: interactive console, playback exhausted, or next input not due yet
+        pp = self._playpair
+        if pp is None or pp[0] > cycles:
+            return
+
+        src = self._playsrc
+        q = self._inputq
+        send_irq = False
+        while pp and (pp[0] <= cycles):
+            chunk = pp[1]
+            if chunk:
+                q.extend(chunk)
+                send_irq = True
+            pp = next(src, None)
+        self._playpair = pp
+
+        notify = self._notify
+        if send_irq and notify:
+            notify()
 
-            if send_irq and self._notify:
-                self._notify()
+    @property
+    def input_ring(self):
+        """The ConsoleInputRing for a "fastmmio" kernel to serve input-port loads from (None if not using one).
+        """
+        return self._ring
 
     def attach(self, host: RISCVSimShell):
         """Attach this console to a given RISCVSimShell instance.
@@ -860,17 +1104,33 @@ class RISCVSimConsole:
     def _mmio_on_load(self, address):
         """Read a pending byte from the console (return 0 if no such byte available).
         """
-        try:
-            return self._inputq.get(False)
-        except queue.Empty:
+        # Make sure any prompt is visible before the program waits on input
+        if self._sink_dirty:
+            self._sink.flush()
+            self._sink_dirty = False
+        q = self._inputq
+        if not q:
             return 0
+        value = q[0]
+        del q[0]
+        if self._ring is not None and q:
+            # The kernel only calls us when the ring is empty; queue up the rest for it to read without us
+            self._ring.refill(q)
+        return value
 
     def _mmio_on_store(self, address, value):
-        """Push a character into the output stream.
+        """Push a character into the output stream (flushed a line at a time on terminals, or when input is read).
         """
-        c = chr((value & 0xff) if value != 13 else 10)
-        self._sink.write(c)
-        self._sink.flush()
+        value &= 0xff
+        if self._sink_raw and not self._sink_dirty:
+            # Text written to the sink since our last flush must come out ahead of bytes that bypass it
+            self._sink.flush()
+        self._sink_write(self._sink_table[value])
+        if (value == 10 or value == 13) and self._line_flush:
+            self._sink.flush()
+            self._sink_dirty = False
+        else:
+            self._sink_dirty = True
 
 
 class RISCVSimKernel:
@@ -878,9 +1138,18 @@ class RISCVSimKernel:
     
     Provides methods to handle all interactions with the kernel.
     """
-    def __init__(self, loaded_library):
+    def __init__(self, loaded_library, use_cffi=True):
         self._dll = loaded_library
-        self._has_disasm = True    # disasm is a backwards compatible extension to API version 1.0 (see `info()`)
+        self._disasm = None    # disasm is a backwards compatible extension to API version 1.0 (resolved by `info()`)
+        self._disasm_cache = {}    # (address, instruction) -> disassembly text
+        self._disasm_buf = ctypes.create_string_buffer(128)    # reused by every rsk_disasm call
+        self._regs_get_bulk = None    # bulk register access is another backwards compatible extension (see `info()`)
+        self._regs_set_bulk = None
+        self._stats_pointer = None    # ...as is reading the stats counters in place ("livestats")
+        self._host_ram = None    # ...and direct access to host RAM ("hostram")
+        self._host_input_ring = None    # ...and console input rings ("fastmmio")
+        self._host_ram_stores = None    # ...and counting direct RAM stores ("ramstores")
+        self._stats_live = None
         
         # rsk_info() -> char ** (NULL terminated list of NUL-terminated C strings)
         self._dll.rsk_info.restype = ctypes.POINTER(ctypes.c_char_p)
@@ -895,20 +1164,20 @@ class RISCVSimKernel:
         self._dll.rsk_stats_report.argtypes = (ctypes.POINTER(rskHostStats),)
         
         # rsk_reg_get(int index) -> ulong
-        self._dll.rsk_reg_get.restype = ctypes.c_ulong
+        self._dll.rsk_reg_get.restype = ctypes.c_uint64
         self._dll.rsk_reg_get.argtypes = (ctypes.c_int,)
         
         # rsk_reg_set(int index, ulonglong value) -> void
         self._dll.rsk_reg_set.restype = None
-        self._dll.rsk_reg_set.argtypes = (ctypes.c_int, ctypes.c_ulong)
+        self._dll.rsk_reg_set.argtypes = (ctypes.c_int, ctypes.c_uint64)
         
         # rsk_pc_get(void) -> ulong
-        self._dll.rsk_pc_get.restype = ctypes.c_ulong
+        self._dll.rsk_pc_get.restype = ctypes.c_uint64
         self._dll.rsk_pc_get.argtypes = ()
         
         # rsk_pc_set(ulong value) -> void
         self._dll.rsk_pc_set.restype = None
-        self._dll.rsk_pc_set.argtypes = (ctypes.c_ulong,)
+        self._dll.rsk_pc_set.argtypes = (ctypes.c_uint64,)
         
         # rsk_config_get(void) -> bitflags
         self._dll.rsk_config_get.restype = ctypes.c_uint
@@ -929,6 +1198,29 @@ class RISCVSimKernel:
         # rsk_cpu_signal(enum signal) -> void
         self._dll.rsk_cpu_signal.restype = None
         self._dll.rsk_cpu_signal.argtypes = (ctypes.c_int,)
+        
+        # The scalar functions are called through cffi if we have it (it skips most of ctypes' per-call overhead);
+        # struct/pointer-based functions (and the host callbacks) stay on ctypes.
+        # Unlike ctypes, cffi rejects out-of-range ints, so the wrappers below wrap values to the C type's width themselves.
+        self._lib = self._dll
+        if use_cffi and cffi is not None and getattr(loaded_library, "_name", None):
+            self._ffi = cffi.FFI()
+            self._ffi.cdef(RSK_CDEF)
+            self._lib = self._ffi.dlopen(loaded_library._name)
+
+        # Pre-bind everything the wrappers call (saves a library attribute lookup per call)
+        self._info = self._dll.rsk_info
+        self._init = self._dll.rsk_init
+        self._stats_report = self._dll.rsk_stats_report
+        self._reg_get = self._lib.rsk_reg_get
+        self._reg_set = self._lib.rsk_reg_set
+        self._pc_get = self._lib.rsk_pc_get
+        self._pc_set = self._lib.rsk_pc_set
+        self._config_get = self._lib.rsk_config_get
+        self._config_set = self._lib.rsk_config_set
+        self._cpu_running = self._lib.rsk_cpu_running
+        self._run = self._lib.rsk_cpu_run
+        self._signal = self._lib.rsk_cpu_signal
     
     def info(self):
         """Calls rsk_info() from the loaded kernel library.
@@ -936,23 +1228,56 @@ class RISCVSimKernel:
         Returns a dictionary of {"name": "value"} parsed from the list of "name=value" strings.
         """
         info = {}
-        cstrings = self._dll.rsk_info()
+        cstrings = self._info()
         if cstrings:
             i = 0
-            while cstrings[i] is not None:
-                fields = cstrings[i].decode('ascii').split('=', 1)
-                if len(fields) == 2:
-                    info[fields[0]] = fields[1]
-                else:
-                    info[fields[0]] = True
+            cs = cstrings[i]
+            while cs is not None:
+                name, sep, value = cs.decode('ascii').partition('=')
+                info[name] = value if sep else True
                 i += 1
+                cs = cstrings[i]
 
         # backwards-compatible addendum to API version 1.0: 
         # if we have a "disasm" feature, resolve/use the "rsk_disasm" library function for trace logs
         if "disasm" in info:
-            self._has_disasm = True
             self._dll.rsk_disasm.restype = None
-            self._dll.rsk_disasm.argtypes = (ctypes.c_ulong, ctypes.c_uint, ctypes.c_char_p, ctypes.c_size_t)
+            self._dll.rsk_disasm.argtypes = (ctypes.c_uint64, ctypes.c_uint, ctypes.c_char_p, ctypes.c_size_t)
+            self._disasm = self._dll.rsk_disasm
+
+        # likewise, "bulkregs" means we can get/set all 32 registers in one call
+        if "bulkregs" in info:
+            self._dll.rsk_regs_get_bulk.restype = None
+            self._dll.rsk_regs_get_bulk.argtypes = (ctypes.POINTER(ctypes.c_uint64),)
+            self._dll.rsk_regs_set_bulk.restype = None
+            self._dll.rsk_regs_set_bulk.argtypes = (ctypes.POINTER(ctypes.c_uint64),)
+            self._regs_get_bulk = self._dll.rsk_regs_get_bulk
+            self._regs_set_bulk = self._dll.rsk_regs_set_bulk
+
+        # "hostram" means the kernel can be handed our RAM to access directly
+        if "hostram" in info:
+            self._dll.rsk_host_ram.restype = None
+            self._dll.rsk_host_ram.argtypes = (ctypes.POINTER(ctypes.c_ubyte), ctypes.c_uint64)
+            self._host_ram = self._dll.rsk_host_ram
+
+        # "fastmmio" means console input-port loads can be served from a ring buffer we keep filled
+        if "fastmmio" in info:
+            self._dll.rsk_host_input_ring.restype = None
+            self._dll.rsk_host_input_ring.argtypes = (ctypes.POINTER(ctypes.c_ubyte), ctypes.POINTER(ctypes.c_uint32),
+                                                      ctypes.POINTER(ctypes.c_uint32), ctypes.c_uint32, ctypes.c_uint64)
+            self._host_input_ring = self._dll.rsk_host_input_ring
+
+        # "ramstores" means the kernel can count its direct RAM stores for us
+        if "ramstores" in info:
+            self._dll.rsk_host_ram_stores.restype = None
+            self._dll.rsk_host_ram_stores.argtypes = (ctypes.POINTER(ctypes.c_uint64),)
+            self._host_ram_stores = self._dll.rsk_host_ram_stores
+
+        # ...and "livestats" means we can read the stats counters in place (once rsk_init() has created the CPU)
+        if "livestats" in info:
+            self._dll.rsk_stats_pointer.restype = ctypes.POINTER(rskHostStats)
+            self._dll.rsk_stats_pointer.argtypes = ()
+            self._stats_pointer = self._dll.rsk_stats_pointer
 
         return info
 
@@ -960,71 +1285,136 @@ class RISCVSimKernel:
         """Uses rsk_disasm(...) [if available!] to disassemble `instruction` (at `address` in RAM).
 
         If the kernel doesn't implement rsk_disasm(...), returns None instead.
+
+        Results are memoized by (address, instruction), since traced loops revisit the same code.
         """
-        if not self._has_disasm:
+        if self._disasm is None:
             return None
 
-        blen = 128
-        buff = ctypes.create_string_buffer(blen)
-        self._dll.rsk_disasm(address, instruction, buff, blen)
-        return ctypes.string_at(buff).decode().strip()
+        key = (address, instruction)
+        text = self._disasm_cache.get(key)
+        if text is None:
+            buff = self._disasm_buf
+            self._disasm(address, instruction, buff, len(buff))
+            text = buff.value.decode('ascii', 'replace').rstrip()
+            self._disasm_cache[key] = text
+        return text
     
     def init(self, host_services : rskHostServices) -> None:
         """Calls rsk_init(...), passing in a structure of callbacks.
         """
-        return self._dll.rsk_init(host_services)
+        self._init(host_services)
+        if self._stats_pointer is not None:
+            live = self._stats_pointer()
+            self._stats_live = live.contents if live else None
     
+    def host_ram(self, ram) -> bool:
+        """Lets the kernel access <ram> (a ctypes c_ubyte array) directly via rsk_host_ram(...) [if available!].
+
+        Must be called after each init(); returns False (leaving every access on the host services) if unsupported.
+        """
+        if self._host_ram is None:
+            return False
+        self._host_ram(ram, len(ram))
+        return True
+
+    def host_input_ring(self, ring, port) -> bool:
+        """Lets the kernel serve loads from MMIO address <port> out of <ring> (a ConsoleInputRing) via rsk_host_input_ring(...) [if available!].
+
+        Must be called after each init(); returns False (leaving such loads on the host services) if unsupported.
+        """
+        if self._host_input_ring is None:
+            return False
+        self._host_input_ring(ring.buffer, ctypes.byref(ring.head), ctypes.byref(ring.tail), ring.mask, port)
+        return True
+
+    def host_ram_stores(self, counter) -> bool:
+        """Has the kernel increment <counter> (a ctypes c_uint64) on each direct RAM store via rsk_host_ram_stores(...) [if available!].
+
+        Must be called after each init(); returns False if unsupported.
+        """
+        if self._host_ram_stores is None:
+            return False
+        self._host_ram_stores(ctypes.byref(counter))
+        return True
+
     def stats(self) -> rskHostStats:
         """Calls rsk_stats_report(...) and returns the populated struct.
+
+        For "livestats" kernels, returns the kernel's own counters instead (which keep counting as the CPU runs).
         """
+        if self._stats_live is not None:
+            return self._stats_live
         stats = rskHostStats()
-        self._dll.rsk_stats_report(stats)
+        self._stats_report(stats)
         return stats
     
     def config_get(self) -> int:
         """Pass-through to rsk_config_get()...
         """
-        return self._dll.rsk_config_get()
+        return self._config_get()
     
     def config_set(self, config_flags : int) -> None:
         """Pass-through to rsk_config_set(...)...
         """
-        self._dll.rsk_config_set(config_flags)
+        self._config_set(config_flags & 0xffffffff)
     
     def reg_get(self, index : int) -> int:
         """Calls rsk_reg_get(bank, index) and returns the result.
         """
-        return self._dll.rsk_reg_get(index)
+        return self._reg_get(index)
     
     def reg_set(self, index : int, value : int):
         """Calls rsk_reg_get(bank, index, value).
         """
-        self._dll.rsk_reg_set(index, value)
+        self._reg_set(index, value & 0xffffffffffffffff)
     
+    def regs_get_bulk(self) -> list:
+        """Returns the values of all 32 registers (x0-x31) via rsk_regs_get_bulk(...) [or rsk_reg_get(...) if unavailable].
+        """
+        if self._regs_get_bulk is None:
+            return [self._reg_get(i) for i in range(32)]
+        values = (ctypes.c_uint64 * 32)()
+        self._regs_get_bulk(values)
+        return list(values)
+
+    def regs_set_bulk(self, values) -> None:
+        """Sets all 32 registers (x0-x31) via rsk_regs_set_bulk(...) [or rsk_reg_set(...) if unavailable].
+        """
+        if self._regs_set_bulk is None:
+            for i, value in enumerate(values):
+                self._reg_set(i, value & 0xffffffffffffffff)
+        else:
+            self._regs_set_bulk((ctypes.c_uint64 * 32)(*values))
+
     def pc_get(self) -> int:
         """Calls rsk_pc_get() and returns the result.
         """
-        return self._dll.rsk_pc_get()
+        return self._pc_get()
     
     def pc_set(self, value : int) -> None:
         """Calls rsk_pc_get(value).
         """
-        self._dll.rsk_pc_set(value)
+        self._pc_set(value & 0xffffffffffffffff)
     
     def is_running(self) -> bool:
         """Calls rsk_cpu_running() and returns the result.
         """
-        return self._dll.rsk_cpu_running() == 1
+        return self._cpu_running() == 1
     
     def run(self, cycles : int) -> int:
         """Pass-through to rsk_cpu_run(cycles)...
+
+        The GIL is released for the duration of the call (both ctypes.CDLL and cffi functions do this),
+        so console reader/notifier threads keep running while the simulator does; the host callbacks
+        (ctypes CFUNCTYPEs) reacquire it on entry. Keep the kernel loaded via CDLL, *not* PyDLL.
         """
-        return self._dll.rsk_cpu_run(cycles)
+        return self._run(cycles)
     
     def signal(self, signal : int) -> None:
         """Pass-through to rsk_cpu_signal(signal)...
         """
-        self._dll.rsk_cpu_signal(signal)
+        self._signal(signal)
 
 
 def mockup_tests(rsk : RISCVSimKernel) -> None:
@@ -1040,8 +1430,8 @@ def mockup_tests(rsk : RISCVSimKernel) -> None:
     rsk.init(mock.host_services)
     if rsk.config_get() != 0:
         panic("Config flags not zero'd by rsk_init...")
-    for i in range(32):
-        if rsk.reg_get(i) != 0:
+    for i, value in enumerate(rsk.regs_get_bulk()):
+        if value != 0:
             panic("Register {0} not zero'd by rsk_init...".format(i))
     if rsk.stats().instructions != 0:
         panic("Instruction count not reset to 0 by CPU initialization...")
@@ -1060,19 +1450,23 @@ def mockup_tests(rsk : RISCVSimKernel) -> None:
         panic("Unable to verify that rsk_reg_set/rsk_reg_get work for x0...")
 
     # Does getting/setting the other registers work?
-    regvalues = [random.randint(0, 2**64-1) for i in range(31)]
-    for i, val in enumerate(regvalues, start=1):
-        rsk.reg_set(i, val)
-    for i, val in enumerate(regvalues, start=1):
-        if rsk.reg_get(i) != val:
-            panic("Unable to verify that rsk_reg_set/rsk_reg_get work for x1 - x31...")
+    regvalues = [random.getrandbits(64) for i in range(31)]
+    rsk.regs_set_bulk([0] + regvalues)
+    if rsk.regs_get_bulk()[1:] != regvalues:
+        panic("Unable to verify that register set/get works for x1 - x31...")
     
     # Does setting pc work?
-    value = random.randint(0, 2**64-1)
+    value = random.getrandbits(64)
     rsk.pc_set(value)
     if rsk.pc_get() != value:
         panic("Unable to verify that rsk_pc_set/rsk_pc_get work...")
 
+    # Are negative values wrapped to 64 bits (as C would), whichever FFI binding is in use?
+    rsk.reg_set(10, -1)
+    rsk.pc_set(-4)
+    if rsk.reg_get(10) != 0xffffffffffffffff or rsk.pc_get() != 0xfffffffffffffffc:
+        panic("Unable to verify that negative register/pc values wrap to 64 bits...")
+
     # How about step counts?
     rsk.run(1)
     if rsk.stats().instructions != 1:
@@ -1084,21 +1478,26 @@ def mockup_tests(rsk : RISCVSimKernel) -> None:
 
 
 def scaled_size(text : str) -> int:
-    M = RGX_MEM_SIZE.match(text.strip().lower())
-    if not M:
+    """Parse a memory size like "4096", "32k", "32kb", or "1M" into a number of bytes.
+    """
+    t = text.strip().lower()
+    i = 0
+    while i < len(t) and t[i].isdigit():
+        i += 1
+    size, scale = t[:i], t[i:]
+    if scale.endswith('b'):
+        scale = scale[:-1]
+    if scale not in MEM_SCALE:
         raise ValueError(text)
-    else:
-        size, scale = M.group("size"), M.group("scale")
-        if scale not in MEM_SCALE:
-            raise ValueError(scale)
-        else:
-            return int(size) * MEM_SCALE[scale]
+    return int(size) * MEM_SCALE[scale]
 
 # NOTE: ARM FIQ mode was removed without a replacement
 def main(argv) -> None:
     ap = argparse.ArgumentParser()
     ap.add_argument("-c", "--checksum", dest="checksum", action="store_true", default=False,
                     help="Compute and display the RAM checksum with every trace log entry (SLOW).")
+    ap.add_argument("-H", "--hash-algo", dest="hash_algo", choices=sorted(CHECKSUM_ALGOS), default="blake2b",
+                    help="Hash algorithm for --checksum (default: blake2b; sha256 is faster on CPUs with SHA extensions).")
     ap.add_argument("-D", "--disasm", dest="disasm", action="store_true", default=False,
                     help="Include ARM instruction disassembly in each trace log record (if kernel supports).")
     ap.add_argument("-d", "--debug-log", dest="debug_log", metavar="FILE", default=None,
@@ -1133,7 +1532,9 @@ def main(argv) -> None:
                           trace_log=args.trace_log,
                           debug_log=args.debug_log,
                           checksum=args.checksum,
+                          checksum_algo=args.hash_algo,
                           disasm_func=rsk.disasm if args.disasm else None)
+    SHUTDOWN.append(shell.flush)
 
     # If so asked, pause and wait for input at this point
     if args.pause:
@@ -1169,12 +1570,20 @@ def main(argv) -> None:
         print("MD5({0}): {1}".format(args.module, shell.md5()))
 
         console = RISCVSimConsole(source=open(args.input_file, "rt", encoding="ascii") if args.input_file else None,
-                                notifier=rsk.signal_irq if 'irq' in info else None)
+                                notifier=rsk.signal_irq if 'irq' in info else None,
+                                fast_input="fastmmio" in info)
         console.attach(shell)
         SHUTDOWN.append(console.close)
 
-        # Initialize the CPU
+        # Initialize the CPU (and let it at our RAM directly, if it can)
         rsk.init(shell.host_services)
+        rsk.host_ram(shell.ram)
+        if console.input_ring is not None:
+            rsk.host_input_ring(console.input_ring, shell.MMIO_BASE + console.READ_PORT_OFFSET)
+
+        # Only --checksum cares how often RAM changes (so only then make the kernel count its stores)
+        if args.checksum and rsk.host_ram_stores(shell.ram_stores):
+            shell.cache_checksums()
 
         # Set config flags (if any)
         cflags = RC_NOTHING
@@ -1187,18 +1596,22 @@ def main(argv) -> None:
         rsk.config_set(cflags)
 
         # Pre-configure processor based on embedded ".riscvsim" section in ELF file (if it exists)
-        elf_compat = elf.get_section(".riscvsim")
+        elf_compat = elf.find_section_fast(b".riscvsim")
         if elf_compat:
             script = RISCVSimElfCompatScript(elf_compat, elf.entry)
             script.apply(rsk)
-            shell._register_history = [rsk.reg_get(i) for i in range(32)]
+            shell._register_history = array.array('Q', rsk.regs_get_bulk())
 
         print()
         print("-"*60)
         print()
         shell.flush()
         start = time.perf_counter()
-        rsk.run(0)
+        try:
+            rsk.run(0)
+        finally:
+            # Don't lose batched trace/debug lines if the run dies (e.g., on an exception or ^C)
+            shell.flush()
         stop = time.perf_counter()
         # Print performance stats
         stats = rsk.stats()
@@ -1242,6 +1655,13 @@ def main(argv) -> None:
         for i in range(100):
             mockup_tests(rsk)
 
+        # ...and again through plain ctypes, if the scalar calls above went through cffi
+        if cffi is not None:
+            rsk_ctypes = RISCVSimKernel(rsk._dll, use_cffi=False)
+            rsk_ctypes.info()
+            for i in range(100):
+                mockup_tests(rsk_ctypes)
+
         print("ALL SANITY CHECKS PASSED--WELL DONE")
 
 
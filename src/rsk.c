@@ -20,6 +20,11 @@ const char* const riscv_sim_info[] = {
     "author=jdoug344",
     "api=1.0",
     "disasm",
+    "hostram",
+    "bulkregs",
+    "fastmmio",
+    "ramstores",
+    "livestats",
     NULL
 };
 
@@ -53,10 +58,26 @@ rsk_config_t rsk_config_get(void) {
     return cpu_get_config(cpu);
 }
 
+void rsk_host_ram(byte* base, dword size) {
+    cpu_attach_ram(cpu, base, size);
+}
+
+void rsk_host_input_ring(byte* ring, uint32_t* head, uint32_t* tail, uint32_t mask, dword port) {
+    cpu_attach_input_ring(cpu, ring, head, tail, mask, port);
+}
+
+void rsk_host_ram_stores(dword* counter) {
+    cpu_attach_ram_stores(cpu, counter);
+}
+
 void rsk_stats_report(rsk_stat_t* stats) {
     cpu_fill_stats(cpu, stats);
 }
 
+const rsk_stat_t* rsk_stats_pointer(void) {
+    return cpu_stats_pointer(cpu);
+}
+
 dword rsk_reg_get(int index) {
     return cpu_read_register(cpu, index);
 }
@@ -65,6 +86,14 @@ void rsk_reg_set(int index, dword value) {
     cpu_write_register(cpu, index, value);
 }
 
+void rsk_regs_get_bulk(dword* values) {
+    for (int i = 0; i < 32; i++) values[i] = cpu_read_register(cpu, i);
+}
+
+void rsk_regs_set_bulk(const dword* values) {
+    for (int i = 0; i < 32; i++) cpu_write_register(cpu, i, values[i]);
+}
+
 dword rsk_pc_get(void) {
     return cpu_get_pc(cpu);
 }
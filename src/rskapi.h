@@ -126,15 +126,37 @@ void rsk_config_set(rsk_config_t flags);
 // Get the current configuration flags
 rsk_config_t rsk_config_get(void);
 
+// Let the kernel serve aligned, in-range loads/stores straight from the host's <size>-byte RAM buffer at <base> instead of calling the host services (backwards compatible extension; advertised as "hostram")
+// Must be called after rsk_init(), which detaches any previously attached RAM; MMIO and other accesses still use the host services
+void rsk_host_ram(byte* base, dword size);
+
+// Let the kernel serve loads from the console input port at MMIO address <port> straight from the host's ring buffer at <ring> (<mask> + 1 bytes, a power of two) (backwards compatible extension; advertised as "fastmmio")
+// The host advances *<head> as it adds bytes and the kernel advances *<tail> as it consumes them; loads that find the ring empty still use the host services.
+// The host may only add bytes from inside a host services call (i.e., on the thread running the CPU). Must be called after rsk_init(), which detaches any previous ring.
+void rsk_host_input_ring(byte* ring, uint32_t* head, uint32_t* tail, uint32_t mask, dword port);
+
+// Have the kernel increment the host-owned *<counter> after each store it makes directly to host RAM (NULL to stop) (backwards compatible extension; advertised as "ramstores")
+// Must be called after rsk_init(), which detaches any previous counter
+void rsk_host_ram_stores(dword* counter);
+
 // Populate a stats-counter struct with the current CPU performance statistics
 void rsk_stats_report(rsk_stat_t* stats);
 
+// Get a pointer to the kernel's live stats counters, valid from rsk_init() on (backwards compatible extension; advertised as "livestats")
+const rsk_stat_t* rsk_stats_pointer(void);
+
 // Get the value of the indicated register (the only legal register indices are [0-31] inclusive)
 dword rsk_reg_get(int index);
 
 // Set the value of the indicated register (the only legal register indices are [0-31] inclusive)
 void rsk_reg_set(int index, dword value);
 
+// Copy the values of all 32 registers (x0-x31) into <values> (backwards compatible extension; advertised as "bulkregs")
+void rsk_regs_get_bulk(dword* values);
+
+// Set all 32 registers (x0-x31) from <values>; the value given for x0 is ignored (backwards compatible extension; advertised as "bulkregs")
+void rsk_regs_set_bulk(const dword* values);
+
 // Get the value of the program counter
 dword rsk_pc_get(void);
 